@@ -1,14 +1,19 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score, mean_squared_error
-from sklearn.model_selection import train_test_split
+import time
 import warnings
+from background_jobs import JobCancelled, LatestJobRunner
+from batch_scoring import SUPPORTED_EXTENSIONS, read_columns, scored_csv_file
+from pipeline import compute_results
+from result_store import get_store
+from gram_regression import feature_names, fit_streaming, generate_chunks, true_coefficients
 warnings.filterwarnings('ignore')
 
+# 跨行程共用的結果快取 (多個 worker 透過 RESULT_STORE_DIR 共用同一個目錄)
+result_store = get_store()
+
 # 設定頁面配置
 st.set_page_config(
     page_title="Linear Regression CRISP-DM",
@@ -49,6 +54,10 @@ if 'data_generated' not in st.session_state:
     st.session_state.data_generated = False
 if 'seed_counter' not in st.session_state:
     st.session_state.seed_counter = 0
+if 'data_key' not in st.session_state:
+    st.session_state.data_key = None
+if 'job_runner' not in st.session_state:
+    st.session_state.job_runner = LatestJobRunner()
 
 # Current parameters
 current_params = (a_value, b_value, noise_level, n_points)
@@ -66,22 +75,50 @@ if params_changed or first_time:
     else:
         # Use truly random seed
         seed = None
-        
-    np.random.seed(seed)
-    X = np.random.uniform(-10, 10, n_points)
-    noise = np.random.normal(0, noise_level, n_points)
-    y = a_value * X + b_value + noise
+
+    # 只有固定種子的資料可以重現，才放進共用快取
+    st.session_state.seed = seed
+    st.session_state.data_key = (current_params, seed) if seed is not None else None
     
     # Update session state
     st.session_state.last_params = current_params
     st.session_state.data_generated = True
-    # Store in session state
-    st.session_state.X = X
-    st.session_state.y = y
 
-# Use data from session state (will always exist now)
-X = st.session_state.X
-y = st.session_state.y
+# 在背景執行緒中產生資料、擬合並繪圖；拖動滑桿時較舊的工作會被取消或丟棄
+job_runner = st.session_state.job_runner
+job_seed = st.session_state.seed
+job_data_key = st.session_state.data_key
+job = job_runner.submit(
+    (current_params, job_seed),
+    lambda is_cancelled: compute_results(
+        current_params, job_seed, job_data_key, result_store, is_cancelled=is_cancelled
+    ),
+)
+
+job_status = st.empty()
+# 等待期間畫面上仍是上一次執行留下的元素 (Streamlit 在 rerun 結束前保留舊元素)
+showing_previous = "，下方暫時顯示上一次完成的結果" if job_runner.has_completed else ""
+try:
+    # 等待期間的 st.* 呼叫是 rerun 的中斷點，新的滑桿值會立即中止這次執行
+    results = job_runner.wait(
+        job, poll=lambda elapsed: job_status.info(f"⏳ 正在計算最新參數的結果 ({elapsed:.1f} s){showing_previous}")
+    )
+except JobCancelled:
+    st.stop()
+job_status.empty()
+
+with st.sidebar.expander("⚙️ 背景運算統計"):
+    stats = job_runner.stats
+    st.write(f"- 提交的工作: {stats.submitted}")
+    st.write(f"- 完成並顯示: {stats.completed}")
+    st.write(f"- 開始前取消: {stats.cancelled}")
+    st.write(f"- 執行中中止: {stats.aborted}")
+    st.write(f"- 完成但已過時: {stats.dropped}")
+    st.write(f"- 有效運算時間: {stats.useful_seconds:.2f} s")
+    st.write(f"- 浪費運算時間: {stats.wasted_seconds:.2f} s")
+
+X = results['X']
+y = results['y']
 
 # Create DataFrame
 df = pd.DataFrame({'X': X, 'y': y})
@@ -136,24 +173,11 @@ with col1:
 
 with col2:
     st.markdown("**📊 Data Distribution**")
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
-    ax1.hist(X, bins=20, alpha=0.7, color='blue')
-    ax1.set_title('Distribution of X')
-    ax1.set_xlabel('X values')
-    ax1.set_ylabel('Frequency')
-    
-    ax2.hist(y, bins=20, alpha=0.7, color='red')
-    ax2.set_title('Distribution of y')
-    ax2.set_xlabel('y values')
-    ax2.set_ylabel('Frequency')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    st.image(results['distribution_png'], use_column_width=True)
 
 # Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X.reshape(-1, 1), y, test_size=0.2, random_state=42
-)
+X_train, X_test = results['X_train'], results['X_test']
+y_train, y_test = results['y_train'], results['y_test']
 
 st.write(f"**Training set size**: {len(X_train)} samples")
 st.write(f"**Test set size**: {len(X_test)} samples")
@@ -161,18 +185,14 @@ st.write(f"**Test set size**: {len(X_test)} samples")
 # CRISP-DM Phase 4: Modeling
 st.subheader("4️⃣ Modeling")
 
-# Create and train the model
-model = LinearRegression()
-model.fit(X_train, y_train)
+# Model fitted from accumulated Gram matrices (XᵀX, Xᵀy) in the background job
+model = results['model']
+train_metrics, test_metrics = results['train_metrics'], results['test_metrics']
 
 # Get model parameters
 estimated_a = model.coef_[0]
 estimated_b = model.intercept_
 
-# Make predictions
-y_train_pred = model.predict(X_train)
-y_test_pred = model.predict(X_test)
-
 col1, col2 = st.columns(2)
 
 with col1:
@@ -192,16 +212,96 @@ with col2:
     st.latex(f"y = {a_value}x + {b_value} + \\epsilon")
     st.caption("其中 ε 是噪音項，ε ~ N(0, σ²)")
 
+# Multi-feature / polynomial regression
+with st.expander("🧮 Multi-feature & Polynomial Regression (streaming Gram matrix)"):
+    st.markdown("""
+將資料產生器與模型擴充為 **d 個特徵** 與 **k 次多項式**：
+
+- 資料以分塊方式產生，每個分塊只更新累積的 XᵀX 與 Xᵀy，不保留完整的 n×p 設計矩陣
+- 以 Cholesky 分解求解正規方程 (矩陣奇異時改用最小平方法)
+- R² 與 RMSE 直接由同一組累積量計算
+- 真實模型中 x1 的一次項係數為側邊欄的 a，截距為 b，其餘係數隨機產生
+""")
+    with st.form("multi_feature_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            n_features = st.slider("Number of features (d)", min_value=1, max_value=200, value=5)
+        with col2:
+            degree = st.slider("Polynomial degree (k)", min_value=1, max_value=5, value=2)
+        with col3:
+            n_rows = st.select_slider(
+                "Number of rows (n)",
+                options=[10_000, 100_000, 500_000, 1_000_000, 2_000_000],
+                value=100_000,
+            )
+        submitted = st.form_submit_button("🚀 Fit multi-feature model")
+
+    # 累積成本為 O(n·p²)；擬合在背景執行緒中進行，等待放在頁面最後，期間可以取消或繼續操作其他元件
+    n_columns = n_features * degree
+    if n_rows * n_columns ** 2 > 2e10:
+        st.warning(f"⚠️ p = {n_columns} 個欄位、n = {n_rows:,} 筆約需 {n_rows * n_columns ** 2:.1e} 次乘加運算，擬合可能需要數分鐘，可隨時取消")
+
+    if 'multi_job_runner' not in st.session_state:
+        st.session_state.multi_job_runner = LatestJobRunner()
+        st.session_state.multi_job = None
+    multi_runner = st.session_state.multi_job_runner
+
+    if submitted:
+        seed = 42 + st.session_state.seed_counter if manual_seed else None
+        coefficients = true_coefficients(n_features, degree, a_value, seed=seed)
+        multi_progress = {'rows': 0}
+
+        def fit_multi_feature(is_cancelled):
+            def report_rows(rows):
+                # 每個區段之後檢查是否已被取消或被新的提交取代
+                if is_cancelled():
+                    raise JobCancelled(f"multi-feature fit stopped after {rows:,} rows")
+                multi_progress['rows'] = rows
+
+            start = time.perf_counter()
+            multi_model, multi_train, multi_test = fit_streaming(
+                generate_chunks(n_rows, coefficients, b_value, noise_level, n_features, degree, seed=seed),
+                n_features, degree, seed=seed, on_progress=report_rows,
+            )
+            return {
+                'model': multi_model,
+                'coefficients': coefficients,
+                'intercept': b_value,
+                'train_metrics': multi_train.metrics(multi_model),
+                'test_metrics': multi_test.metrics(multi_model),
+                'names': feature_names(n_features, degree),
+                'rows': n_rows,
+                'seconds': time.perf_counter() - start,
+            }
+
+        if seed is None:
+            # 隨機種子的結果無法重現，不放進快取；每次提交都是新的工作
+            multi_key = ('multi_fit', n_features, degree, n_rows, a_value, b_value, noise_level, time.time_ns())
+            multi_fn = fit_multi_feature
+        else:
+            multi_key = ('multi_fit', n_features, degree, n_rows, a_value, b_value, noise_level, seed)
+
+            def multi_fn(is_cancelled):
+                return result_store.get_or_compute(multi_key, lambda: fit_multi_feature(is_cancelled))
+
+        st.session_state.multi_job = multi_runner.submit(multi_key, multi_fn)
+        st.session_state.multi_progress = (multi_progress, n_rows)
+
+    if st.session_state.multi_job is not None and st.button("⏹️ Cancel multi-feature fit"):
+        multi_runner.cancel()
+        st.session_state.multi_job = None
+        st.info("已取消多特徵擬合")
+
+    multi_status = st.empty()
+    # 結果在頁面最後才填入；以單欄 columns 作為容器 (AppTest 無法解析 st.container)
+    multi_output = st.columns(1)[0]
+
 # CRISP-DM Phase 5: Evaluation
 st.subheader("5️⃣ Evaluation")
 
-# Calculate metrics
-r2_train = r2_score(y_train, y_train_pred)
-r2_test = r2_score(y_test, y_test_pred)
-mse_train = mean_squared_error(y_train, y_train_pred)
-mse_test = mean_squared_error(y_test, y_test_pred)
-rmse_train = np.sqrt(mse_train)
-rmse_test = np.sqrt(mse_test)
+# Calculate metrics from the same Gram accumulators used for fitting
+r2_train, rmse_train = train_metrics
+r2_test, rmse_test = test_metrics
 
 col1, col2, col3 = st.columns(3)
 
@@ -230,63 +330,7 @@ st.info("""
 兩條線之間的小差異是正常的，因為擬合線是從有噪音的資料中學習得到的。
 """)
 
-fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
-
-# Scatter plot with regression line
-ax1.scatter(X_train.flatten(), y_train, alpha=0.6, color='blue', label='Training data')
-ax1.scatter(X_test.flatten(), y_test, alpha=0.6, color='red', label='Test data')
-
-# Plot regression line
-X_line = np.linspace(X.min(), X.max(), 100).reshape(-1, 1)
-y_line_pred = model.predict(X_line)
-ax1.plot(X_line, y_line_pred, color='green', linewidth=2, 
-         label=f'Fitted line: y = {estimated_a:.2f}x + {estimated_b:.2f}')
-
-# Plot true line
-y_line_true = a_value * X_line.flatten() + b_value
-ax1.plot(X_line, y_line_true, color='orange', linewidth=2, linestyle='--', 
-         label=f'True line: y = {a_value}x + {b_value} (no noise)')
-
-ax1.set_xlabel('X')
-ax1.set_ylabel('y')
-ax1.set_title('Linear Regression: Fitted vs True Line')
-ax1.legend()
-ax1.grid(True, alpha=0.3)
-
-# Residuals plot
-residuals_train = y_train - y_train_pred
-residuals_test = y_test - y_test_pred
-ax2.scatter(y_train_pred, residuals_train, alpha=0.6, color='blue', label='Training')
-ax2.scatter(y_test_pred, residuals_test, alpha=0.6, color='red', label='Test')
-ax2.axhline(y=0, color='black', linestyle='--', alpha=0.8)
-ax2.set_xlabel('Predicted values')
-ax2.set_ylabel('Residuals')
-ax2.set_title('Residuals Plot')
-ax2.legend()
-ax2.grid(True, alpha=0.3)
-
-# Predicted vs Actual
-ax3.scatter(y_train, y_train_pred, alpha=0.6, color='blue', label='Training')
-ax3.scatter(y_test, y_test_pred, alpha=0.6, color='red', label='Test')
-min_val, max_val = min(y.min(), y_train_pred.min(), y_test_pred.min()), max(y.max(), y_train_pred.max(), y_test_pred.max())
-ax3.plot([min_val, max_val], [min_val, max_val], 'k--', alpha=0.8, label='Perfect fit')
-ax3.set_xlabel('Actual values')
-ax3.set_ylabel('Predicted values')
-ax3.set_title('Predicted vs Actual')
-ax3.legend()
-ax3.grid(True, alpha=0.3)
-
-# Distribution of residuals
-ax4.hist(residuals_train, bins=15, alpha=0.7, color='blue', label='Training residuals')
-ax4.hist(residuals_test, bins=10, alpha=0.7, color='red', label='Test residuals')
-ax4.set_xlabel('Residuals')
-ax4.set_ylabel('Frequency')
-ax4.set_title('Distribution of Residuals')
-ax4.legend()
-ax4.grid(True, alpha=0.3)
-
-plt.tight_layout()
-st.pyplot(fig)
+st.image(results['performance_png'], use_column_width=True)
 
 # CRISP-DM Phase 6: Deployment
 st.subheader("6️⃣ Deployment")
@@ -302,6 +346,7 @@ st.markdown("""
 **📋 Deployment Checklist**:
 - ✅ Interactive parameter tuning
 - ✅ Real-time visualization
+- ✅ Batch prediction for uploaded CSV/Parquet files
 - ✅ Model performance metrics
 - ✅ Data quality checks
 - ✅ CRISP-DM methodology documentation
@@ -321,6 +366,56 @@ with col2:
 with col3:
     st.metric("True y (no noise)", f"{true_y:.2f}")
 
+# Batch prediction
+st.markdown("**📦 Batch Prediction**")
+st.caption("上傳含有 X 值的 CSV/Parquet 檔案，系統會逐塊以向量化方式計算 ŷ = ax + b，不會一次載入整個檔案")
+uploaded_file = st.file_uploader("Upload X values for batch prediction", type=list(SUPPORTED_EXTENSIONS))
+
+if uploaded_file is not None:
+    try:
+        columns = read_columns(uploaded_file, uploaded_file.name)
+    except (ValueError, ImportError) as e:
+        st.error(f"❌ 無法讀取檔案: {e}")
+        columns = []
+
+    if columns:
+        default_index = columns.index('X') if 'X' in columns else 0
+        x_column = st.selectbox("Column containing X values", columns, index=default_index)
+
+        if st.button("🚀 Run batch prediction"):
+            progress_bar = st.progress(0.0)
+            status = st.empty()
+
+            def report_progress(progress, rows, seconds):
+                progress_bar.progress(progress)
+                rate = rows / seconds if seconds > 0 else 0.0
+                status.write(f"已處理 {rows:,} 筆 | {rate:,.0f} rows/s")
+
+            # 結果逐塊寫入磁碟上的暫存檔，而不是累積在記憶體中的 DataFrame。
+            # 注意: st.download_button 會把整個檔案讀進記憶體交給瀏覽器，在這個 Streamlit 版本中
+            # 只有「寫入磁碟」這一段是串流的，下載時輸出仍會完整載入記憶體。
+            # report_progress 中的 st.* 呼叫是 rerun 的中斷點；暫存檔由 scored_csv_file 在任何情況下刪除
+            try:
+                with scored_csv_file(
+                    uploaded_file, uploaded_file.name, x_column,
+                    estimated_a, estimated_b, on_progress=report_progress,
+                ) as (scored_path, result):
+                    progress_bar.progress(1.0)
+                    status.success(
+                        f"✅ 完成 {result.rows:,} 筆預測，耗時 {result.seconds:.2f} 秒 "
+                        f"({result.rows_per_second:,.0f} rows/s)"
+                    )
+                    # download_button 只接受 bytes 或 BufferedReader 等型別，不接受 TemporaryFile
+                    with open(scored_path, "rb") as scored:
+                        st.download_button(
+                            "⬇️ Download predictions (CSV)",
+                            data=scored,
+                            file_name=f"{uploaded_file.name.rsplit('.', 1)[0]}_predictions.csv",
+                            mime="text/csv",
+                        )
+            except (ValueError, KeyError) as e:
+                st.error(f"❌ 批次預測失敗: {e}")
+
 # Model summary
 st.markdown("---")
 st.subheader("📊 Summary")
@@ -328,7 +423,7 @@ st.subheader("📊 Summary")
 summary_text = f"""
 **Model Summary**:
 - **Dataset Size**: {n_points} points
-- **Model Type**: Simple Linear Regression
+- **Model Type**: Simple Linear Regression (Gram matrix + Cholesky solver)
 - **True Parameters**: a = {a_value}, b = {b_value}
 - **Estimated Parameters**: a = {estimated_a:.3f}, b = {estimated_b:.3f}
 - **Model Performance**: R² = {r2_test:.3f}, RMSE = {rmse_test:.3f}
@@ -350,4 +445,50 @@ st.markdown(
     </div>
     """, 
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+# 多特徵擬合：等待放在頁面最後，其餘內容不會被擋住；
+# 等待期間的 st.* 呼叫是 rerun 的中斷點，調整其他元件或按下取消會立即中止等待
+if st.session_state.multi_job is not None:
+    progress, total_rows = st.session_state.multi_progress
+    try:
+        st.session_state.multi_result = multi_runner.wait(
+            st.session_state.multi_job,
+            poll=lambda elapsed: multi_status.progress(
+                progress['rows'] / total_rows,
+                text=f"⏳ 多特徵擬合中: {progress['rows']:,} / {total_rows:,} 筆 ({elapsed:.1f} s)",
+            ),
+        )
+    except JobCancelled:
+        pass
+    st.session_state.multi_job = None
+    multi_status.empty()
+
+if 'multi_result' in st.session_state:
+    result = st.session_state.multi_result
+    multi_model = result['model']
+    n_columns = len(result['names'])
+
+    with multi_output:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Training R²", f"{result['train_metrics'][0]:.4f}")
+            st.metric("Training RMSE", f"{result['train_metrics'][1]:.3f}")
+        with col2:
+            st.metric("Test R²", f"{result['test_metrics'][0]:.4f}")
+            st.metric("Test RMSE", f"{result['test_metrics'][1]:.3f}")
+        with col3:
+            st.metric("Rows", f"{result['rows']:,}")
+            st.metric("Gram matrix", f"{n_columns} × {n_columns}")
+        with col4:
+            st.metric("Fit time", f"{result['seconds']:.2f} s")
+            st.metric("Solver", multi_model.solver)
+
+        coef_df = pd.DataFrame({
+            'Term': result['names'] + ['intercept'],
+            'True': np.append(result['coefficients'], result['intercept']),
+            'Estimated': np.append(multi_model.coef_, multi_model.intercept_),
+        })
+        coef_df['Error'] = (coef_df['Estimated'] - coef_df['True']).abs()
+        st.write(f"**Max coefficient error**: {coef_df['Error'].max():.4f}")
+        st.dataframe(coef_df, use_container_width=True, height=300)
@@ -0,0 +1,129 @@
+"""
+背景運算：在執行緒池中執行耗時的階段，並取消被新參數取代的工作
+
+拖動滑桿時 Streamlit 會連續觸發 rerun。每次提交工作時遞增 generation，
+較舊 generation 的工作會被取消 (尚未開始)、在階段之間中止 (執行中)，
+或在完成後丟棄結果 (已來不及中止)，並統計浪費的運算量。
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """工作已被較新的 generation 取代"""
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """回傳本行程所有 session 共用的執行緒池"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="crispdm-job")
+        return _executor
+
+
+@dataclass
+class JobStats:
+    """工作統計；aborted 與 dropped 的運算時間計入 wasted_seconds"""
+
+    submitted: int = 0
+    completed: int = 0
+    cancelled: int = 0  # 尚未開始就被取消，沒有浪費運算
+    aborted: int = 0  # 執行中於階段之間中止
+    dropped: int = 0  # 執行完成但結果已過時
+    useful_seconds: float = 0.0
+    wasted_seconds: float = 0.0
+
+    @property
+    def wasted_jobs(self) -> int:
+        return self.aborted + self.dropped
+
+
+class LatestJobRunner:
+    """只保留最新一次提交的工作
+
+    不保存完成的結果 (每個 session 各一份，含圖表 PNG 會佔用記憶體)，只記錄是否曾經完成過。
+    等待新結果時畫面上仍顯示上一次的內容，是靠 Streamlit 在 rerun 結束前保留舊元素 (stale elements) 達成的。
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+        self._key: Optional[Hashable] = None
+        self.generation = 0
+        self.has_completed = False
+        self.stats = JobStats()
+
+    def submit(self, key: Hashable, fn: Callable[[Callable[[], bool]], Any]) -> Future:
+        """提交 fn(is_cancelled)；key 與目前的工作相同時直接沿用該工作"""
+        with self._lock:
+            future = self._future
+            if future is not None and key == self._key and not future.cancelled():
+                if not future.done() or future.exception() is None:
+                    return future
+
+            self.generation += 1
+            generation = self.generation
+            if future is not None and future.cancel():
+                self.stats.cancelled += 1
+            self.stats.submitted += 1
+            self._key = key
+            executor = self._executor or get_executor()
+            self._future = executor.submit(self._run, generation, fn)
+            return self._future
+
+    def cancel(self) -> None:
+        """放棄目前的工作：尚未開始者直接取消，執行中者在下一個檢查點中止"""
+        with self._lock:
+            self.generation += 1
+            self._key = None
+            if self._future is not None and self._future.cancel():
+                self.stats.cancelled += 1
+            self._future = None
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self.generation
+
+    def _run(self, generation: int, fn: Callable[[Callable[[], bool]], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = fn(lambda: not self.is_current(generation))
+        except JobCancelled:
+            with self._lock:
+                self.stats.aborted += 1
+                self.stats.wasted_seconds += time.perf_counter() - start
+            raise
+
+        with self._lock:
+            elapsed = time.perf_counter() - start
+            if not self.is_current(generation):
+                self.stats.dropped += 1
+                self.stats.wasted_seconds += elapsed
+                raise JobCancelled(f"generation {generation} superseded by {self.generation}")
+            self.stats.completed += 1
+            self.stats.useful_seconds += elapsed
+            self.has_completed = True
+        return result
+
+    @staticmethod
+    def wait(future: Future, poll: Optional[Callable[[float], None]] = None, interval: float = 0.1) -> Any:
+        """等待工作完成；poll(已等待秒數) 會定期被呼叫
+
+        在 Streamlit 中 poll 應呼叫 st.* (例如更新佔位元素)，這些呼叫是 rerun 的中斷點，
+        使腳本能在等待時立即回應新的滑桿值。
+        """
+        start = time.perf_counter()
+        while not future.done():
+            if poll is not None:
+                poll(time.perf_counter() - start)
+            time.sleep(interval)
+        return future.result()
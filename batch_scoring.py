@@ -0,0 +1,150 @@
+"""
+批次預測：以串流、分塊向量化的方式對上傳的 CSV/Parquet 檔案計算 y = a*x + b
+"""
+
+import io
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 每個分塊讀取的列數；記憶體用量只和分塊大小有關，與檔案總列數無關
+DEFAULT_CHUNK_ROWS = 200_000
+
+SUPPORTED_EXTENSIONS = ("csv", "parquet")
+
+
+@dataclass
+class BatchResult:
+    """批次預測的統計結果"""
+
+    rows: int
+    chunks: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _file_format(file_name: str) -> str:
+    """由副檔名判斷檔案格式"""
+    extension = file_name.rsplit(".", 1)[-1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported file type '.{extension}', expected one of {SUPPORTED_EXTENSIONS}"
+        )
+    return extension
+
+
+def _parquet_file(source: BinaryIO):
+    """開啟 Parquet 檔案 (需要 pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet files requires pyarrow: pip install pyarrow") from e
+    return pq.ParquetFile(source)
+
+
+def read_columns(source: BinaryIO, file_name: str) -> List[str]:
+    """只讀取檔頭，回傳可用的欄位名稱"""
+    source.seek(0)
+    if _file_format(file_name) == "csv":
+        columns = list(pd.read_csv(source, nrows=0).columns)
+    else:
+        columns = list(_parquet_file(source).schema_arrow.names)
+    source.seek(0)
+    return columns
+
+
+def iter_x_chunks(
+    source: BinaryIO,
+    file_name: str,
+    column: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[Tuple[np.ndarray, float]]:
+    """逐塊讀取 x 欄位，回傳 (x 陣列, 已處理比例)"""
+    source.seek(0)
+    if _file_format(file_name) == "csv":
+        source.seek(0, io.SEEK_END)
+        total_bytes = max(source.tell(), 1)
+        source.seek(0)
+        reader = pd.read_csv(
+            source, usecols=[column], dtype={column: np.float64}, chunksize=chunk_rows
+        )
+        for frame in reader:
+            # CSV 無法預先得知列數，以已讀取的位元組數估計進度
+            yield frame[column].to_numpy(), min(source.tell() / total_bytes, 1.0)
+    else:
+        parquet = _parquet_file(source)
+        total_rows = max(parquet.metadata.num_rows, 1)
+        seen = 0
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=[column]):
+            x = batch.column(0).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+            seen += len(x)
+            yield x, min(seen / total_rows, 1.0)
+
+
+def score_chunk(x: np.ndarray, a: float, b: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """向量化計算 a*x + b；提供 out 時原地寫入以避免額外配置"""
+    if out is None:
+        out = np.empty_like(x, dtype=np.float64)
+    np.multiply(x, a, out=out)
+    np.add(out, b, out=out)
+    return out
+
+
+def stream_scores(
+    source: BinaryIO,
+    file_name: str,
+    column: str,
+    a: float,
+    b: float,
+    sink: BinaryIO,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_progress: Optional[Callable[[float, int, float], None]] = None,
+) -> BatchResult:
+    """逐塊預測並把 CSV 結果寫入 sink，不會一次載入整個輸入或輸出"""
+    start = time.perf_counter()
+    rows = 0
+    chunks = 0
+    sink.write(f"{column},y_pred\n".encode())
+    for x, progress in iter_x_chunks(source, file_name, column, chunk_rows):
+        y_pred = score_chunk(x, a, b)
+        pd.DataFrame({column: x, "y_pred": y_pred}).to_csv(
+            sink, header=False, index=False, mode="wb"
+        )
+        rows += len(x)
+        chunks += 1
+        if on_progress is not None:
+            on_progress(progress, rows, time.perf_counter() - start)
+    sink.flush()
+    return BatchResult(rows=rows, chunks=chunks, seconds=time.perf_counter() - start)
+
+
+@contextmanager
+def scored_csv_file(
+    source: BinaryIO,
+    file_name: str,
+    column: str,
+    a: float,
+    b: float,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_progress: Optional[Callable[[float, int, float], None]] = None,
+    directory: Optional[str] = None,
+) -> Iterator[Tuple[str, BatchResult]]:
+    """把預測結果串流寫入暫存目錄中的 CSV，回傳 (檔案路徑, 統計)
+
+    離開 with 區塊時一定刪除暫存檔，包括 on_progress 丟出的 BaseException
+    (例如 Streamlit 的 RerunException/StopException) 與寫入時的 OSError。
+    """
+    with tempfile.TemporaryDirectory(dir=directory, prefix="crispdm-scores-") as tmp:
+        path = os.path.join(tmp, "predictions.csv")
+        with open(path, "wb") as sink:
+            result = stream_scores(source, file_name, column, a, b, sink, chunk_rows, on_progress)
+        yield path, result
@@ -0,0 +1,231 @@
+"""
+多特徵與多項式線性迴歸：以串流方式累積 Gram 矩陣 (XᵀX, Xᵀy) 後求解
+
+每個資料分塊只需 O(m·p²) 的矩陣乘法更新累積量，求解為 O(p³)，
+不需要在記憶體中保留完整的 n×p 設計矩陣。
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+
+# 每個分塊展開後設計矩陣 (m×p, float64) 的記憶體上限；分塊列數由欄位數 p 推算，
+# 因此 p 很大 (例如 d=200、k=5) 時分塊會自動變小
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
+# 同一個 seed 衍生出的獨立亂數流：係數、資料、訓練/測試分割各用一個，彼此不會重用同一串亂數
+_COEFFICIENT_STREAM, _DATA_STREAM, _SPLIT_STREAM = range(3)
+
+
+def _rng(seed: Optional[int], stream: int) -> np.random.Generator:
+    """由 seed 衍生第 stream 個獨立的亂數產生器"""
+    return np.random.default_rng(np.random.SeedSequence(seed).spawn(3)[stream])
+
+
+def chunk_rows_for(n_columns: int, budget_bytes: int = DEFAULT_CHUNK_BYTES) -> int:
+    """在記憶體上限內，p 個欄位的設計矩陣每塊最多可以有幾列"""
+    return max(1, budget_bytes // (8 * n_columns))
+
+
+@dataclass
+class LinearModel:
+    """求解後的線性模型，屬性命名與 sklearn 相同 (coef_, intercept_)"""
+
+    coef_: np.ndarray
+    intercept_: float
+    solver: str = "cholesky"
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+        return X @ self.coef_ + self.intercept_
+
+
+def polynomial_features(X: np.ndarray, degree: int) -> np.ndarray:
+    """展開每個特徵的 1..degree 次方，欄位順序為 [X, X², ..., X^degree]
+
+    只展開各特徵自身的次方（不含交互項），因此欄位數為 d·degree。
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(-1, 1)
+    if degree < 1:
+        raise ValueError(f"degree must be >= 1, got {degree}")
+    if degree == 1:
+        return X
+    return np.hstack([X ** power for power in range(1, degree + 1)])
+
+
+def feature_names(n_features: int, degree: int) -> List[str]:
+    """與 polynomial_features 欄位順序相同的名稱"""
+    names = []
+    for power in range(1, degree + 1):
+        suffix = "" if power == 1 else f"^{power}"
+        names.extend(f"x{j + 1}{suffix}" for j in range(n_features))
+    return names
+
+
+def true_coefficients(n_features: int, degree: int, slope: float, seed: Optional[int] = None) -> np.ndarray:
+    """產生真實係數：x1 的一次項為 slope，其餘係數隨機，高次項依次方縮小"""
+    rng = _rng(seed, _COEFFICIENT_STREAM)
+    coefficients = np.empty(n_features * degree)
+    for power in range(1, degree + 1):
+        block = slice((power - 1) * n_features, power * n_features)
+        # 資料範圍為 [-10, 10]，以 10^(power-1) 縮小高次項以免其主導 y
+        coefficients[block] = rng.uniform(-2.0, 2.0, n_features) / 10.0 ** (power - 1)
+    coefficients[0] = slope
+    return coefficients
+
+
+def generate_chunks(
+    n_points: int,
+    coefficients: np.ndarray,
+    intercept: float,
+    noise_level: float,
+    n_features: int,
+    degree: int,
+    seed: Optional[int] = None,
+    chunk_rows: Optional[int] = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """逐塊產生 (X, y)，X 為 (m, d) 的原始特徵，X ~ U(-10, 10)
+
+    未指定 chunk_rows 時，依展開後的欄位數 d·degree 決定分塊大小。
+    """
+    rng = _rng(seed, _DATA_STREAM)
+    if chunk_rows is None:
+        chunk_rows = chunk_rows_for(n_features * degree)
+    remaining = n_points
+    while remaining > 0:
+        rows = min(chunk_rows, remaining)
+        X = rng.uniform(-10, 10, (rows, n_features))
+        y = polynomial_features(X, degree) @ coefficients + intercept
+        y += rng.normal(0, noise_level, rows)
+        remaining -= rows
+        yield X, y
+
+
+class GramAccumulator:
+    """累積 XᵀX、Xᵀy、yᵀy 等充分統計量，可分塊更新、合併與求解
+
+    截距項不會實際加入設計矩陣，而是以欄位總和另外累積。
+    """
+
+    def __init__(self, n_columns: int):
+        self.n_columns = n_columns
+        self.n = 0
+        self.x_sum = np.zeros(n_columns)
+        self.y_sum = 0.0
+        self.xtx = np.zeros((n_columns, n_columns))
+        self.xty = np.zeros(n_columns)
+        self.yty = 0.0
+
+    def update(self, design: np.ndarray, y: np.ndarray) -> "GramAccumulator":
+        """加入一個分塊：design 為 (m, p) 設計矩陣，y 為 (m,)"""
+        design = np.asarray(design, dtype=np.float64)
+        if design.ndim == 1:
+            design = design.reshape(-1, 1)
+        y = np.asarray(y, dtype=np.float64)
+        if design.shape[1] != self.n_columns:
+            raise ValueError(f"expected {self.n_columns} columns, got {design.shape[1]}")
+        self.n += len(y)
+        self.x_sum += design.sum(axis=0)
+        self.y_sum += float(y.sum())
+        self.xtx += design.T @ design
+        self.xty += design.T @ y
+        self.yty += float(y @ y)
+        return self
+
+    def merge(self, other: "GramAccumulator") -> "GramAccumulator":
+        """合併另一個累積器（例如不同分塊或不同行程的結果）"""
+        if other.n_columns != self.n_columns:
+            raise ValueError(f"expected {self.n_columns} columns, got {other.n_columns}")
+        self.n += other.n
+        self.x_sum += other.x_sum
+        self.y_sum += other.y_sum
+        self.xtx += other.xtx
+        self.xty += other.xty
+        self.yty += other.yty
+        return self
+
+    def solve(self) -> LinearModel:
+        """以 Cholesky 分解求解正規方程；矩陣奇異時改用最小平方法"""
+        if self.n == 0:
+            raise ValueError("cannot solve an empty accumulator")
+        x_mean = self.x_sum / self.n
+        y_mean = self.y_sum / self.n
+        # 由累積量直接得到中心化的共變異矩陣，避免截距與高次項造成的病態條件
+        cov = self.xtx - self.n * np.outer(x_mean, x_mean)
+        cross = self.xty - self.n * x_mean * y_mean
+        scale = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        scale[scale == 0] = 1.0
+        corr = cov / np.outer(scale, scale)
+        rhs = cross / scale
+
+        try:
+            coef = cho_solve(cho_factor(corr), rhs)
+            solver = "cholesky"
+        except np.linalg.LinAlgError:
+            coef = np.linalg.lstsq(corr, rhs, rcond=None)[0]
+            solver = "lstsq"
+
+        coef = coef / scale
+        intercept = float(y_mean - x_mean @ coef)
+        return LinearModel(coef_=coef, intercept_=intercept, solver=solver)
+
+    def metrics(self, model: LinearModel) -> Tuple[float, float]:
+        """以累積量計算 (R², RMSE)，不需要重新掃描資料"""
+        if self.n == 0:
+            raise ValueError("cannot evaluate an empty accumulator")
+        coef, intercept = model.coef_, model.intercept_
+        # SSE = Σ(y - Xβ - b)² 展開後只需要累積量
+        sse = (
+            self.yty
+            - 2.0 * (coef @ self.xty + intercept * self.y_sum)
+            + coef @ self.xtx @ coef
+            + 2.0 * intercept * (coef @ self.x_sum)
+            + self.n * intercept ** 2
+        )
+        sse = max(sse, 0.0)
+        sst = self.yty - self.y_sum ** 2 / self.n
+        r2 = 1.0 - sse / sst if sst > 0 else 0.0
+        rmse = float(np.sqrt(sse / self.n))
+        return r2, rmse
+
+
+def fit_streaming(
+    chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+    n_features: int,
+    degree: int = 1,
+    test_size: float = 0.2,
+    seed: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Tuple[LinearModel, GramAccumulator, GramAccumulator]:
+    """單次掃描資料分塊，分配訓練/測試列並各自累積 Gram 矩陣
+
+    較大的分塊會再切成符合 DEFAULT_CHUNK_BYTES 的區段後才展開多項式。
+    每個區段的測試列數取自二項分布，並取區段末端的連續列作為測試集，
+    以切片 (view) 代替布林索引的複製；因此假設各列是隨機順序 (generate_chunks 產生的資料即是如此)。
+    每個區段累積後以已處理列數呼叫 on_progress；on_progress 可丟出例外以中止擬合。
+
+    回傳 (模型, 訓練累積器, 測試累積器)。
+    """
+    rng = _rng(seed, _SPLIT_STREAM)
+    n_columns = n_features * degree
+    block_rows = chunk_rows_for(n_columns)
+    train = GramAccumulator(n_columns)
+    test = GramAccumulator(n_columns)
+    rows = 0
+    for X, y in chunks:
+        for start in range(0, len(y), block_rows):
+            design = polynomial_features(X[start:start + block_rows], degree)
+            y_block = y[start:start + block_rows]
+            split = len(y_block) - int(rng.binomial(len(y_block), test_size))
+            train.update(design[:split], y_block[:split])
+            test.update(design[split:], y_block[split:])
+            rows += len(y_block)
+            if on_progress is not None:
+                on_progress(rows)
+    return train.solve(), train, test
@@ -0,0 +1,172 @@
+"""
+主要運算流程：產生資料 → 切分與擬合 → 繪製圖表
+
+這裡的函式都不呼叫 st.*，因此可以在背景執行緒中執行 (見 background_jobs.py)。
+圖表使用 matplotlib 的 Figure 物件而非 pyplot，避免多個執行緒共用 pyplot 的全域狀態。
+"""
+
+import io
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+from matplotlib.figure import Figure
+from sklearn.model_selection import train_test_split
+
+from background_jobs import JobCancelled
+from gram_regression import GramAccumulator
+from result_store import ResultStore
+
+
+def generate_data(params, seed):
+    """依參數 (a, b, noise_level, n_points) 產生資料；seed 為 None 時使用隨機種子"""
+    a_value, b_value, noise_level, n_points = params
+    # 使用獨立的 RandomState 而非 np.random.seed，避免不同 session 的執行緒互相干擾
+    rng = np.random.RandomState(seed)
+    X = rng.uniform(-10, 10, n_points)
+    noise = rng.normal(0, noise_level, n_points)
+    y = a_value * X + b_value + noise
+    return X, y
+
+
+def fit_model(X_train, X_test, y_train, y_test):
+    """由累積的 Gram 矩陣 (XᵀX, Xᵀy) 擬合模型，並以同一組累積量計算指標"""
+    train_gram = GramAccumulator(1).update(X_train, y_train)
+    test_gram = GramAccumulator(1).update(X_test, y_test)
+    model = train_gram.solve()
+    return model, train_gram.metrics(model), test_gram.metrics(model)
+
+
+def render_png(fig):
+    """把圖表繪製成 PNG 位元組 (與 st.pyplot 相同的設定)，以便存入快取"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, bbox_inches='tight', dpi=200, format='png')
+    return buffer.getvalue()
+
+
+def render_distribution_figure(X, y):
+    fig = Figure(figsize=(10, 4))
+    ax1, ax2 = fig.subplots(1, 2)
+    ax1.hist(X, bins=20, alpha=0.7, color='blue')
+    ax1.set_title('Distribution of X')
+    ax1.set_xlabel('X values')
+    ax1.set_ylabel('Frequency')
+
+    ax2.hist(y, bins=20, alpha=0.7, color='red')
+    ax2.set_title('Distribution of y')
+    ax2.set_xlabel('y values')
+    ax2.set_ylabel('Frequency')
+
+    fig.tight_layout()
+    return render_png(fig)
+
+
+def render_performance_figure(params, X, y, X_train, X_test, y_train, y_test, model):
+    a_value, b_value = params[0], params[1]
+    estimated_a, estimated_b = model.coef_[0], model.intercept_
+    y_train_pred = model.predict(X_train)
+    y_test_pred = model.predict(X_test)
+
+    fig = Figure(figsize=(15, 10))
+    ((ax1, ax2), (ax3, ax4)) = fig.subplots(2, 2)
+
+    # Scatter plot with regression line
+    ax1.scatter(X_train.flatten(), y_train, alpha=0.6, color='blue', label='Training data')
+    ax1.scatter(X_test.flatten(), y_test, alpha=0.6, color='red', label='Test data')
+
+    # Plot regression line
+    X_line = np.linspace(X.min(), X.max(), 100).reshape(-1, 1)
+    y_line_pred = model.predict(X_line)
+    ax1.plot(X_line, y_line_pred, color='green', linewidth=2, 
+             label=f'Fitted line: y = {estimated_a:.2f}x + {estimated_b:.2f}')
+
+    # Plot true line
+    y_line_true = a_value * X_line.flatten() + b_value
+    ax1.plot(X_line, y_line_true, color='orange', linewidth=2, linestyle='--', 
+             label=f'True line: y = {a_value}x + {b_value} (no noise)')
+
+    ax1.set_xlabel('X')
+    ax1.set_ylabel('y')
+    ax1.set_title('Linear Regression: Fitted vs True Line')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # Residuals plot
+    residuals_train = y_train - y_train_pred
+    residuals_test = y_test - y_test_pred
+    ax2.scatter(y_train_pred, residuals_train, alpha=0.6, color='blue', label='Training')
+    ax2.scatter(y_test_pred, residuals_test, alpha=0.6, color='red', label='Test')
+    ax2.axhline(y=0, color='black', linestyle='--', alpha=0.8)
+    ax2.set_xlabel('Predicted values')
+    ax2.set_ylabel('Residuals')
+    ax2.set_title('Residuals Plot')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    # Predicted vs Actual
+    ax3.scatter(y_train, y_train_pred, alpha=0.6, color='blue', label='Training')
+    ax3.scatter(y_test, y_test_pred, alpha=0.6, color='red', label='Test')
+    min_val, max_val = min(y.min(), y_train_pred.min(), y_test_pred.min()), max(y.max(), y_train_pred.max(), y_test_pred.max())
+    ax3.plot([min_val, max_val], [min_val, max_val], 'k--', alpha=0.8, label='Perfect fit')
+    ax3.set_xlabel('Actual values')
+    ax3.set_ylabel('Predicted values')
+    ax3.set_title('Predicted vs Actual')
+    ax3.legend()
+    ax3.grid(True, alpha=0.3)
+
+    # Distribution of residuals
+    ax4.hist(residuals_train, bins=15, alpha=0.7, color='blue', label='Training residuals')
+    ax4.hist(residuals_test, bins=10, alpha=0.7, color='red', label='Test residuals')
+    ax4.set_xlabel('Residuals')
+    ax4.set_ylabel('Frequency')
+    ax4.set_title('Distribution of Residuals')
+    ax4.legend()
+    ax4.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    return render_png(fig)
+
+
+def compute_results(
+    params,
+    seed: Optional[int],
+    data_key: Optional[Hashable] = None,
+    store: Optional[ResultStore] = None,
+    is_cancelled: Callable[[], bool] = lambda: False,
+):
+    """依序執行所有耗時階段，並在階段之間檢查工作是否已被取代
+
+    data_key 不為 None 時 (固定隨機種子)，各階段的結果透過 store 在 worker 間共用。
+    """
+
+    def stage(name, compute):
+        if is_cancelled():
+            raise JobCancelled(name)
+        if store is None or data_key is None:
+            return compute()
+        return store.get_or_compute((name,) + data_key, compute)
+
+    X, y = stage('dataset', lambda: generate_data(params, seed))
+    X_train, X_test, y_train, y_test = train_test_split(
+        X.reshape(-1, 1), y, test_size=0.2, random_state=42
+    )
+    model, train_metrics, test_metrics = stage(
+        'model', lambda: fit_model(X_train, X_test, y_train, y_test)
+    )
+    distribution_png = stage('distribution_figure', lambda: render_distribution_figure(X, y))
+    performance_png = stage(
+        'performance_figure',
+        lambda: render_performance_figure(params, X, y, X_train, X_test, y_train, y_test, model),
+    )
+    return {
+        'X': X,
+        'y': y,
+        'X_train': X_train,
+        'X_test': X_test,
+        'y_train': y_train,
+        'y_test': y_test,
+        'model': model,
+        'train_metrics': train_metrics,
+        'test_metrics': test_metrics,
+        'distribution_png': distribution_png,
+        'performance_png': performance_png,
+    }
@@ -0,0 +1,158 @@
+"""
+跨行程共用的結果快取：多個 Streamlit worker 透過同一個磁碟目錄共用
+產生的資料集、擬合的模型與繪製完成的圖表
+
+- 每個鍵對應一個 pickle 檔案，先寫入暫存檔再以 os.replace 原子替換，
+  因此其他行程永遠不會讀到寫到一半的檔案
+- 總大小超過上限時，依最後存取時間 (mtime) 淘汰最舊的項目 (LRU)
+- 不使用檔案鎖：兩個 worker 同時計算同一個鍵時兩者都會計算，結果相同，後寫入者覆蓋
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Callable, Hashable, Optional
+
+# 快取內容格式改變時遞增，使舊的項目自動失效
+STORE_VERSION = 2
+
+DEFAULT_DIRECTORY = os.path.join(tempfile.gettempdir(), "crispdm-result-store")
+DEFAULT_MAX_MB = 256
+
+_ENTRY_SUFFIX = ".pkl"
+_TMP_SUFFIX = ".tmp"
+
+# 超過這個時間仍存在的暫存檔視為寫入中途崩潰留下的檔案 (正在寫入的檔案不會存在這麼久)
+_STALE_TMP_SECONDS = 3600
+
+
+class ResultStore:
+    """以磁碟目錄實作、有大小上限與 LRU 淘汰的鍵值快取"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: Hashable) -> str:
+        digest = hashlib.sha256(repr((STORE_VERSION, key)).encode()).hexdigest()
+        return os.path.join(self.directory, digest + _ENTRY_SUFFIX)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """讀取項目並更新其存取時間；不存在時回傳 default"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            # 項目不存在，或在讀取時被其他行程淘汰
+            self.misses += 1
+            return default
+        except Exception:
+            # 損毀或由舊版程式寫入而無法載入的項目 (例如類別欄位已改變)：視為未命中並刪除
+            self.misses += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """原子寫入項目，必要時淘汰最舊的項目"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=_TMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """快取命中時直接回傳，否則計算並寫入"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        """回傳 [(mtime, size, path)]，略過已被其他行程刪除的檔案"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _remove_stale_tmp_files(self) -> None:
+        """刪除寫入中途崩潰留下的暫存檔；_entries 不會列出它們，否則會一直佔用空間"""
+        cutoff = time.time() - _STALE_TMP_SECONDS
+        for name in os.listdir(self.directory):
+            if not name.endswith(_TMP_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        self._remove_stale_tmp_files()
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_store: Optional[ResultStore] = None
+
+
+def get_store() -> ResultStore:
+    """回傳本行程共用的快取實例
+
+    目錄與大小上限可用環境變數 RESULT_STORE_DIR 與 RESULT_STORE_MAX_MB 設定，
+    多個 worker 指向同一個目錄即可共用快取。
+    """
+    global _store
+    if _store is None:
+        directory = os.environ.get("RESULT_STORE_DIR", DEFAULT_DIRECTORY)
+        max_mb = float(os.environ.get("RESULT_STORE_MAX_MB", DEFAULT_MAX_MB))
+        _store = ResultStore(directory, int(max_mb * 1024 * 1024))
+    return _store
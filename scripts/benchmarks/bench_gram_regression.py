@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+效能測試：串流 Gram 矩陣迴歸 (fit_streaming，與 app 相同的流程) 在不同 n (資料筆數)、
+d (特徵數) 與 k (多項式次數) 下的擴展曲線
+
+計時包含多項式展開、依記憶體上限重新切分區段、訓練/測試分割與累積，不包含資料產生。
+
+用法:
+    python scripts/benchmarks/bench_gram_regression.py
+    python scripts/benchmarks/bench_gram_regression.py --max-rows 5000000 --plot scaling.png
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from gram_regression import chunk_rows_for, fit_streaming, generate_chunks, true_coefficients
+
+
+def _timed_chunks(chunks, timer):
+    """包裝資料產生器，把產生資料所花的時間累加到 timer['seconds']"""
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            timer['seconds'] += time.perf_counter() - start
+        yield chunk
+
+
+def time_fit(n_rows, n_features, degree, chunk_rows):
+    """回傳 (擬合時間, 求解時間)；擬合時間為 fit_streaming 的總時間扣除資料產生的時間"""
+    coefficients = true_coefficients(n_features, degree, 2.0, seed=0)
+    chunks = generate_chunks(n_rows, coefficients, 5.0, 2.0, n_features, degree, seed=1,
+                             chunk_rows=chunk_rows)
+    generate = {'seconds': 0.0}
+    start = time.perf_counter()
+    _, train, _ = fit_streaming(_timed_chunks(chunks, generate), n_features, degree, seed=2)
+    fit_seconds = time.perf_counter() - start - generate['seconds']
+    start = time.perf_counter()
+    train.solve()
+    return fit_seconds, time.perf_counter() - start
+
+
+def run_series(label, points, chunk_rows):
+    """執行一組 (n, d, k) 測試並印出結果表"""
+    print(f"\n{label}")
+    print(f"{'n':>10} {'d':>5} {'k':>3} {'p':>5} {'fit (s)':>10} {'solve (s)':>10} {'rows/s':>14} "
+          f"{'block rows':>11} {'n×p matrix (MB)':>16}")
+    results = []
+    for n_rows, n_features, degree in points:
+        fit_seconds, solve_seconds = time_fit(n_rows, n_features, degree, chunk_rows)
+        n_columns = n_features * degree
+        rate = n_rows / fit_seconds if fit_seconds > 0 else float('inf')
+        design_mb = n_rows * n_columns * 8 / 1e6
+        print(f"{n_rows:>10,} {n_features:>5} {degree:>3} {n_columns:>5} {fit_seconds:>10.3f} "
+              f"{solve_seconds:>10.4f} {rate:>14,.0f} {chunk_rows_for(n_columns):>11,} {design_mb:>16,.1f}")
+        results.append((n_rows, n_features, degree, fit_seconds, solve_seconds))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-rows", type=int, default=2_000_000, help="largest n in the n-scaling series")
+    parser.add_argument("--max-features", type=int, default=256, help="largest d in the d-scaling series")
+    parser.add_argument("--rows-for-features", type=int, default=200_000, help="n used in the d- and k-scaling series")
+    parser.add_argument("--max-degree", type=int, default=5, help="largest k in the k-scaling series")
+    parser.add_argument("--features-for-degree", type=int, default=32, help="d used in the k-scaling series")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help="rows per streamed chunk (default: sized from d by the memory budget)")
+    parser.add_argument("--plot", help="save the scaling curves to this image file")
+    args = parser.parse_args()
+
+    print("🎯 串流 Gram 矩陣迴歸效能測試")
+    print("=" * 50)
+
+    n_values = [n for n in (10_000, 100_000, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000)
+                if n <= args.max_rows]
+    d_values = [d for d in (1, 2, 4, 8, 16, 32, 64, 128, 256, 512) if d <= args.max_features]
+
+    by_rows = run_series("📈 n 擴展 (d = 32, k = 1): 成本應為 O(n)",
+                         [(n, 32, 1) for n in n_values], args.chunk_rows)
+    by_features = run_series(f"📈 d 擴展 (n = {args.rows_for_features:,}, k = 1): 累積 O(n·p²)、求解 O(p³)",
+                             [(args.rows_for_features, d, 1) for d in d_values], args.chunk_rows)
+    by_degree = run_series(
+        f"📈 k 擴展 (n = {args.rows_for_features:,}, d = {args.features_for_degree}): p = d·k，累積 O(n·p²)",
+        [(args.rows_for_features, args.features_for_degree, k) for k in range(1, args.max_degree + 1)],
+        args.chunk_rows,
+    )
+
+    if args.plot:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(17, 4.5))
+        ax1.loglog([r[0] for r in by_rows], [r[3] + r[4] for r in by_rows], 'o-')
+        ax1.set_xlabel('n (rows)')
+        ax1.set_ylabel('Fit time (s)')
+        ax1.set_title('Scaling with n (d = 32, k = 1)')
+        ax1.grid(True, alpha=0.3)
+
+        ax2.loglog([r[1] for r in by_features], [r[3] for r in by_features], 'o-', label='Fit O(n·p²)')
+        ax2.loglog([r[1] for r in by_features], [r[4] for r in by_features], 's--', label='Solve O(p³)')
+        ax2.set_xlabel('d (features)')
+        ax2.set_ylabel('Time (s)')
+        ax2.set_title(f'Scaling with d (n = {args.rows_for_features:,}, k = 1)')
+        ax2.legend()
+        ax2.grid(True, alpha=0.3)
+
+        ax3.plot([r[2] for r in by_degree], [r[3] for r in by_degree], 'o-', label='Fit O(n·p²)')
+        ax3.plot([r[2] for r in by_degree], [r[4] for r in by_degree], 's--', label='Solve O(p³)')
+        ax3.set_xlabel('k (polynomial degree)')
+        ax3.set_ylabel('Time (s)')
+        ax3.set_title(f'Scaling with k (n = {args.rows_for_features:,}, d = {args.features_for_degree})')
+        ax3.legend()
+        ax3.grid(True, alpha=0.3)
+
+        plt.tight_layout()
+        plt.savefig(args.plot, dpi=150, bbox_inches='tight')
+        print(f"\n圖片已保存為 {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
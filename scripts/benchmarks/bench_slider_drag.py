@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+效能測試：拖動滑桿時被取代的 rerun 浪費了多少運算
+
+模擬使用者拖動 Number of Points 滑桿，每隔 --interval 秒送出一個新值，比較:
+- no-interrupt: 假設每個排隊的 rerun 都完整執行 (資料產生、擬合與繪圖)；
+                原本的 app 並非如此，這一列只是浪費運算的上限
+- before:       原本的 app 在腳本執行緒中計算，新值到達後，rerun 會在下一個 st.* 呼叫處被中斷。
+                以 compute_results 的各階段模擬這些中斷點 (各階段即原本 app 中兩次 st.* 呼叫之間的運算)，
+                正在執行的階段一定會做完
+- after:        以 LatestJobRunner 在背景執行，較舊的工作被取消、中止或丟棄
+
+AppTest 無法在執行中途送出 rerun 請求，因此 before 是以相同中斷點模擬的結果，而不是實際驅動舊版 app 量測。
+
+用法:
+    python scripts/benchmarks/bench_slider_drag.py
+    python scripts/benchmarks/bench_slider_drag.py --steps 30 --interval 0.05
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from background_jobs import JobCancelled, LatestJobRunner
+from pipeline import compute_results
+
+
+def slider_values(steps):
+    """Number of Points 由 50 拖到 500"""
+    return [(2.0, 5.0, 2.0, 50 + round(i * 450 / max(steps - 1, 1) / 10) * 10) for i in range(steps)]
+
+
+def run_no_interrupt(values, interval):
+    """每個值依序完整計算；完成時已有更新的值到達者視為浪費"""
+    clock = 0.0
+    computed = wasted = 0
+    wasted_seconds = useful_seconds = 0.0
+    for i, params in enumerate(values):
+        clock = max(clock, i * interval)
+        start = time.perf_counter()
+        compute_results(params, seed=42)
+        elapsed = time.perf_counter() - start
+        clock += elapsed
+        computed += 1
+        superseded = i + 1 < len(values) and clock > (i + 1) * interval
+        if superseded:
+            wasted += 1
+            wasted_seconds += elapsed
+        else:
+            useful_seconds += elapsed
+    latency = clock - (len(values) - 1) * interval
+    return computed, wasted, useful_seconds, wasted_seconds, latency
+
+
+def run_before(values, interval):
+    """在腳本執行緒中計算，並在各階段之間 (原本的 st.* 中斷點) 改為計算最新到達的值"""
+    start = time.perf_counter()
+    last = len(values) - 1
+
+    def latest_arrived():
+        return min(last, int((time.perf_counter() - start) / interval))
+
+    computed = wasted = 0
+    wasted_seconds = useful_seconds = 0.0
+    index = 0
+    while True:
+        delay = start + index * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        index = latest_arrived()
+        computed += 1
+        run_start = time.perf_counter()
+        try:
+            compute_results(values[index], 42, is_cancelled=lambda index=index: latest_arrived() > index)
+            # 最後一次 st.pyplot 也是中斷點：完成時若已有新值，結果不會被顯示
+            superseded = latest_arrived() > index
+        except JobCancelled:
+            superseded = True
+        elapsed = time.perf_counter() - run_start
+        if superseded:
+            wasted += 1
+            wasted_seconds += elapsed
+            continue
+        useful_seconds += elapsed
+        if index == last:
+            latency = time.perf_counter() - (start + last * interval)
+            return computed, wasted, useful_seconds, wasted_seconds, latency
+        index += 1
+
+
+def run_after(values, interval):
+    """每個值到達時提交背景工作，只等待最後一個值的結果"""
+    runner = LatestJobRunner()
+    start = time.perf_counter()
+    future = None
+    for i, params in enumerate(values):
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        future = runner.submit(
+            params, lambda is_cancelled, params=params: compute_results(params, 42, is_cancelled=is_cancelled)
+        )
+    last_event = time.perf_counter()
+    future.result()
+    latency = time.perf_counter() - last_event
+
+    # 等待被取代但仍在執行的工作結束，統計才會完整
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        stats = runner.stats
+        if stats.completed + stats.cancelled + stats.aborted + stats.dropped >= stats.submitted:
+            break
+        time.sleep(0.05)
+    stats = runner.stats
+    computed = stats.submitted - stats.cancelled
+    return computed, stats.wasted_jobs, stats.useful_seconds, stats.wasted_seconds, latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=20, help="number of slider values during the drag")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between slider values")
+    args = parser.parse_args()
+
+    values = slider_values(args.steps)
+    print("🎯 滑桿拖動浪費運算測試")
+    print("=" * 50)
+    print(f"滑桿值: {len(values)} 個, 間隔 {args.interval * 1000:.0f} ms")
+    print(f"{'mode':>12} {'started':>8} {'wasted':>7} {'useful (s)':>11} {'wasted (s)':>11} {'latency (s)':>12}")
+
+    for mode, run in (("no-interrupt", run_no_interrupt), ("before", run_before), ("after", run_after)):
+        computed, wasted, useful_seconds, wasted_seconds, latency = run(values, args.interval)
+        print(f"{mode:>12} {computed:>8} {wasted:>7} {useful_seconds:>11.2f} {wasted_seconds:>11.2f} {latency:>12.2f}")
+
+    print("\nlatency: 最後一個滑桿值送出後，到其結果可以顯示所需的時間")
+    print("no-interrupt 假設每個 rerun 都完整執行，只是上限；before 以 st.* 中斷點模擬原本的 app")
+
+
+if __name__ == "__main__":
+    main()
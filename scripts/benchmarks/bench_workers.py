@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+效能測試：Streamlit worker 行程數量與整體吞吐量的關係
+
+每個 worker 是一個獨立的 Python 行程，以 Streamlit AppTest 重複執行 app.py
+(產生資料、擬合、繪圖)，模擬使用者調整參數造成的 rerun。分兩種模式測量:
+
+- no-cache: 關閉固定隨機種子，app 不使用共用快取，每次 rerun 都完整計算；
+            只反映 worker 數量 (多核心平行) 的效果
+- shared:   所有 worker 共用同一個結果快取目錄並走訪同一組參數；
+            與 no-cache 的比值即為跨行程快取的效果
+
+用法:
+    python scripts/benchmarks/bench_workers.py
+    python scripts/benchmarks/bench_workers.py --workers 1 2 4 8 --reruns 30 --distinct-params 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+MODES = ("no-cache", "shared")
+
+
+def worker(worker_id, mode, reruns, distinct_params, ready, start_event, results):
+    """單一 worker 行程：執行 reruns 次 app.py，回傳 (完成次數, 快取命中, 快取未命中)
+
+    發生例外時在目前等待中的佇列放入 ("error", 訊息)，讓主行程立即停止而不是一直等待。
+    """
+    reply = ready
+    try:
+        from streamlit.testing.v1 import AppTest
+        from result_store import get_store
+
+        app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=300)
+        app.run()
+        if mode == "no-cache":
+            # 未固定隨機種子的資料無法重現，app 不會把它放進共用快取
+            app.checkbox[0].uncheck().run()
+        store = get_store()
+        store.hits = store.misses = 0
+
+        ready.put(("ready", worker_id))
+        reply = results
+        start_event.wait()
+        for i in range(reruns):
+            # 不同 worker 以不同順序走訪同一組參數，模擬多位使用者；相鄰兩次的參數一定不同
+            noise_level = 0.5 + ((worker_id * 7 + i) % distinct_params) * 0.5
+            [s for s in app.slider if s.label == "Noise Level"][0].set_value(noise_level)
+            app.run()
+            if app.exception:
+                raise RuntimeError(app.exception[0].value)
+        results.put(("done", reruns, store.hits, store.misses))
+    except BaseException as e:
+        reply.put(("error", f"worker {worker_id}: {type(e).__name__}: {e}"))
+        raise
+
+
+def collect(messages, processes, timeout):
+    """從佇列取得每個 worker 的一則訊息
+
+    worker 回報錯誤、異常結束 (exitcode 非 0) 或超過 timeout 秒時丟出 RuntimeError。
+    """
+    collected = []
+    deadline = time.perf_counter() + timeout
+    while len(collected) < len(processes):
+        try:
+            message = messages.get(timeout=1.0)
+        except queue.Empty:
+            crashed = [p for p in processes if p.exitcode not in (None, 0)]
+            if crashed:
+                raise RuntimeError(f"worker process exited with code {crashed[0].exitcode}")
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"timed out after {timeout} s waiting for workers")
+            continue
+        if message[0] == "error":
+            raise RuntimeError(message[1])
+        collected.append(message[1:])
+    return collected
+
+
+def run(mode, n_workers, reruns, distinct_params, store_dir, timeout):
+    """啟動 n_workers 個行程並回傳 (每秒 rerun 數, 命中數, 未命中數)"""
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.environ["RESULT_STORE_DIR"] = store_dir
+
+    ready = multiprocessing.Queue()
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker, args=(i, mode, reruns, distinct_params, ready, start_event, results)
+        )
+        for i in range(n_workers)
+    ]
+    for p in processes:
+        p.start()
+    try:
+        # 等待所有 worker 完成啟動 (import 與第一次執行) 後再開始計時
+        collect(ready, processes, timeout)
+
+        start = time.perf_counter()
+        start_event.set()
+        totals = collect(results, processes, timeout)
+        seconds = time.perf_counter() - start
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+
+    completed = sum(t[0] for t in totals)
+    return completed / seconds, sum(t[1] for t in totals), sum(t[2] for t in totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[n for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)] or [1])
+    parser.add_argument("--reruns", type=int, default=20, help="reruns per worker")
+    parser.add_argument("--distinct-params", type=int, default=10,
+                        help="number of distinct slider values shared by all workers (>= 2)")
+    parser.add_argument("--timeout", type=float, default=600,
+                        help="seconds to wait for the workers to start and to finish each run")
+    args = parser.parse_args()
+    if args.distinct_params < 2:
+        parser.error("--distinct-params must be at least 2 so every rerun changes a parameter")
+
+    print("🎯 多 worker 吞吐量測試")
+    print("=" * 50)
+    print(f"CPU 核心數: {os.cpu_count()}")
+    print(f"{'workers':>8} {'no-cache reruns/s':>18} {'scaling':>8} "
+          f"{'shared reruns/s':>16} {'cache gain':>11} {'hit rate':>9}")
+
+    store_dir = tempfile.mkdtemp(prefix="bench-result-store-")
+    baseline = None
+    try:
+        for n_workers in args.workers:
+            uncached, _, _ = run("no-cache", n_workers, args.reruns, args.distinct_params, store_dir, args.timeout)
+            shared, hits, misses = run("shared", n_workers, args.reruns, args.distinct_params, store_dir,
+                                       args.timeout)
+            baseline = baseline or uncached
+            hit_rate = hits / (hits + misses) if hits + misses else 0.0
+            print(f"{n_workers:>8} {uncached:>18.2f} {uncached / baseline:>7.2f}x "
+                  f"{shared:>16.2f} {shared / uncached:>10.2f}x {hit_rate:>9.1%}")
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    print("\nscaling: no-cache 模式相對於第一列的吞吐量 (只反映 worker 數量的效果)")
+    print("cache gain: 同一 worker 數量下 shared 相對於 no-cache 的吞吐量 (只反映共用快取的效果)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+測試 app.py 的批次預測流程：從上傳檔案到下載按鈕 (以 Streamlit AppTest 執行整個 app)
+"""
+
+import io
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+import result_store  # noqa: E402
+
+
+class _UploadedFile(io.BytesIO):
+    """模擬 st.file_uploader 回傳的 UploadedFile (BytesIO 加上 name)"""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def test_batch_prediction_offers_download():
+    """測試批次預測完成後顯示下載按鈕且不會丟出例外"""
+    source = io.BytesIO()
+    pd.DataFrame({'X': np.linspace(-10, 10, 1_000)}).to_csv(source, index=False)
+    upload = _UploadedFile(source.getvalue(), 'points.csv')
+
+    with tempfile.TemporaryDirectory() as store_dir, \
+            mock.patch.dict(os.environ, {'RESULT_STORE_DIR': store_dir}), \
+            mock.patch.object(result_store, '_store', None), \
+            mock.patch.object(streamlit, 'file_uploader', return_value=upload):
+        app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120).run()
+        assert not app.exception
+
+        [b for b in app.button if 'batch prediction' in b.label][0].click().run()
+        assert not app.exception, app.exception
+        assert [s for s in app.success if '1,000' in s.value]
+        assert len(app.get('download_button')) == 1
+        print("✅ 批次預測完成並提供下載")
+
+
+def test_multi_feature_fit_runs_in_background():
+    """測試多特徵擬合以背景工作執行並在頁面最後顯示結果"""
+    with tempfile.TemporaryDirectory() as store_dir, \
+            mock.patch.dict(os.environ, {'RESULT_STORE_DIR': store_dir}), \
+            mock.patch.object(result_store, '_store', None):
+        app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120).run()
+        assert not app.exception
+
+        [b for b in app.button if 'Fit multi-feature' in b.label][0].click().run()
+        assert not app.exception, app.exception
+        assert app.session_state.multi_job is None
+        assert app.session_state.multi_result['rows'] == 100_000
+        assert [m for m in app.metric if m.label == 'Gram matrix' and m.value == '10 × 10']
+        print("✅ 多特徵擬合完成")
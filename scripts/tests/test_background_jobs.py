@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+測試背景運算：generation 標記、取消被取代的工作與浪費運算統計
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from background_jobs import JobCancelled, LatestJobRunner
+from pipeline import compute_results, generate_data
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_same_key_reuses_job():
+    """測試相同參數不會重新提交工作"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        runner = LatestJobRunner(executor)
+        first = runner.submit(('a',), lambda is_cancelled: 1)
+        assert runner.submit(('a',), lambda is_cancelled: 2) is first
+        assert LatestJobRunner.wait(first) == 1
+        assert runner.stats.submitted == 1
+        assert runner.has_completed
+        print("✅ 相同參數沿用既有工作")
+
+
+def test_superseded_jobs_are_cancelled_aborted_or_dropped():
+    """測試被取代的工作：尚未開始者取消、執行中者中止、已完成者丟棄"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        runner = LatestJobRunner(executor)
+        started = threading.Event()
+        release = threading.Event()
+
+        def stage_job(is_cancelled):
+            started.set()
+            release.wait()
+            if is_cancelled():
+                raise JobCancelled()
+            return 'stale'
+
+        running = runner.submit(1, stage_job)
+        started.wait()
+        pending = runner.submit(2, lambda is_cancelled: 'pending')
+        latest = runner.submit(3, lambda is_cancelled: 'latest')
+        release.set()
+
+        assert pending.cancelled()
+        assert LatestJobRunner.wait(latest) == 'latest'
+        _wait_until(running.done)
+        assert isinstance(running.exception(), JobCancelled)
+
+        stats = runner.stats
+        assert (stats.submitted, stats.completed, stats.cancelled, stats.aborted) == (3, 1, 1, 1)
+        assert runner.has_completed
+
+        # 無法中止的工作在完成後才被取代，其結果會被丟棄
+        slow_started = threading.Event()
+        finish = threading.Event()
+        slow = runner.submit(4, lambda is_cancelled: slow_started.set() or finish.wait() and 'too late')
+        slow_started.wait()
+        newest = runner.submit(5, lambda is_cancelled: 'newest')
+        finish.set()
+        assert LatestJobRunner.wait(newest) == 'newest'
+        _wait_until(slow.done)
+        assert isinstance(slow.exception(), JobCancelled)
+        assert runner.stats.dropped == 1
+        assert runner.stats.wasted_jobs == 2
+        print(f"✅ 被取代的工作已處理: {runner.stats}")
+
+
+def test_cancel_stops_running_job():
+    """測試 cancel 讓執行中的工作在下一個檢查點中止，之後相同的 key 會重新提交"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        runner = LatestJobRunner(executor)
+        started = threading.Event()
+
+        def checkpoint_job(is_cancelled):
+            started.set()
+            while not is_cancelled():
+                time.sleep(0.01)
+            raise JobCancelled()
+
+        running = runner.submit('fit', checkpoint_job)
+        started.wait()
+        runner.cancel()
+        _wait_until(running.done)
+        assert isinstance(running.exception(), JobCancelled)
+        assert runner.stats.aborted == 1
+        assert not runner.has_completed
+
+        again = runner.submit('fit', lambda is_cancelled: 'done')
+        assert again is not running
+        assert LatestJobRunner.wait(again) == 'done'
+        print("✅ 取消執行中的工作")
+
+
+def test_compute_results_stops_between_stages():
+    """測試運算流程在階段之間檢查取消並與原本的資料產生方式一致"""
+    params = (2.0, 5.0, 1.0, 100)
+    results = compute_results(params, seed=42)
+    np.random.seed(42)
+    np.testing.assert_array_equal(results['X'], np.random.uniform(-10, 10, 100))
+    assert len(results['X_train']) == 80
+    assert results['distribution_png'].startswith(b'\x89PNG')
+    assert results['performance_png'].startswith(b'\x89PNG')
+
+    try:
+        compute_results(params, seed=42, is_cancelled=lambda: True)
+    except JobCancelled:
+        print("✅ 運算流程可在階段之間中止")
+    else:
+        raise AssertionError("expected JobCancelled")
+
+    X, y = generate_data(params, seed=7)
+    assert len(X) == len(y) == 100
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+測試批次預測：分塊讀取、向量化計算與串流輸出
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from batch_scoring import read_columns, score_chunk, scored_csv_file, stream_scores
+
+
+def _csv_upload(x):
+    source = io.BytesIO()
+    pd.DataFrame({'id': np.arange(len(x)), 'X': x}).to_csv(source, index=False)
+    return source
+
+
+def test_score_chunk():
+    """測試向量化計算 a*x + b"""
+    x = np.array([-1.0, 0.0, 2.5])
+    np.testing.assert_allclose(score_chunk(x, 2.0, 5.0), [3.0, 5.0, 10.0])
+
+    out = np.empty_like(x)
+    assert score_chunk(x, 2.0, 5.0, out=out) is out
+    print("✅ 向量化計算正確")
+
+
+def test_stream_scores_csv():
+    """測試 CSV 分塊預測與進度回報"""
+    x = np.random.default_rng(42).uniform(-10, 10, 1_000)
+    source = _csv_upload(x)
+    assert read_columns(source, 'data.csv') == ['id', 'X']
+
+    progress = []
+    sink = io.BytesIO()
+    result = stream_scores(source, 'data.csv', 'X', 2.0, 5.0, sink, chunk_rows=300,
+                           on_progress=lambda p, rows, seconds: progress.append((p, rows)))
+
+    assert result.rows == 1_000
+    assert result.chunks == 4
+    assert [rows for _, rows in progress] == [300, 600, 900, 1_000]
+    assert progress[-1][0] == 1.0
+
+    sink.seek(0)
+    scored = pd.read_csv(sink)
+    assert list(scored.columns) == ['X', 'y_pred']
+    np.testing.assert_allclose(scored['y_pred'], 2.0 * x + 5.0)
+    print(f"✅ CSV 批次預測成功: {result.rows} 筆, {result.chunks} 個分塊")
+
+
+def test_stream_scores_parquet():
+    """測試 Parquet 分塊預測"""
+    x = np.linspace(-10, 10, 250)
+    source = io.BytesIO()
+    pd.DataFrame({'X': x}).to_parquet(source)
+
+    sink = io.BytesIO()
+    result = stream_scores(source, 'data.parquet', 'X', -1.5, 3.0, sink, chunk_rows=100)
+
+    assert result.rows == 250
+    sink.seek(0)
+    np.testing.assert_allclose(pd.read_csv(sink)['y_pred'], -1.5 * x + 3.0)
+    print(f"✅ Parquet 批次預測成功: {result.rows} 筆")
+
+
+def test_scored_csv_file_removed_after_use():
+    """測試暫存 CSV 在 with 區塊結束後被刪除"""
+    x = np.linspace(-10, 10, 500)
+    with tempfile.TemporaryDirectory() as directory:
+        with scored_csv_file(_csv_upload(x), 'data.csv', 'X', 2.0, 5.0, chunk_rows=200,
+                             directory=directory) as (path, result):
+            assert result.rows == 500
+            np.testing.assert_allclose(pd.read_csv(path)['y_pred'], 2.0 * x + 5.0)
+        assert os.listdir(directory) == []
+    print("✅ 暫存 CSV 使用後已刪除")
+
+
+class _Interrupted(BaseException):
+    """模擬 Streamlit 的 RerunException/StopException (繼承自 BaseException)"""
+
+
+def test_scored_csv_file_removed_when_interrupted():
+    """測試進度回報時被 rerun 中斷 (BaseException) 不會留下寫到一半的暫存檔"""
+    def interrupt(progress, rows, seconds):
+        raise _Interrupted()
+
+    x = np.linspace(-10, 10, 1_000)
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            with scored_csv_file(_csv_upload(x), 'data.csv', 'X', 2.0, 5.0, chunk_rows=200,
+                                 on_progress=interrupt, directory=directory):
+                raise AssertionError("scoring should have been interrupted")
+        except _Interrupted:
+            pass
+        assert os.listdir(directory) == []
+    print("✅ 中斷時暫存檔已刪除")
+
+
+def test_unsupported_file_type():
+    """測試不支援的檔案格式"""
+    try:
+        read_columns(io.BytesIO(b"X\n1\n"), 'data.txt')
+    except ValueError:
+        print("✅ 不支援的檔案格式會被拒絕")
+    else:
+        raise AssertionError("expected ValueError for unsupported file type")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+測試串流 Gram 矩陣迴歸：多特徵、多項式、分塊累積與由累積量計算的指標
+"""
+
+import os
+import sys
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score, mean_squared_error
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from gram_regression import (
+    DEFAULT_CHUNK_BYTES, GramAccumulator, chunk_rows_for, feature_names, fit_streaming,
+    generate_chunks, polynomial_features, true_coefficients,
+)
+
+
+def test_polynomial_features():
+    """測試多項式展開的欄位順序"""
+    X = np.array([[1.0, 2.0], [3.0, -1.0]])
+    expanded = polynomial_features(X, 2)
+    np.testing.assert_allclose(expanded, [[1.0, 2.0, 1.0, 4.0], [3.0, -1.0, 9.0, 1.0]])
+    assert feature_names(2, 2) == ['x1', 'x2', 'x1^2', 'x2^2']
+    print("✅ 多項式展開正確")
+
+
+def test_chunked_fit_matches_sklearn():
+    """測試分塊累積的結果與 sklearn 一次擬合完整設計矩陣相同"""
+    n_features, degree = 4, 3
+    coefficients = true_coefficients(n_features, degree, 2.0, seed=1)
+    chunks = list(generate_chunks(5_000, coefficients, 5.0, 1.0, n_features, degree,
+                                  seed=2, chunk_rows=700))
+
+    accumulator = GramAccumulator(n_features * degree)
+    for X, y in chunks:
+        accumulator.update(polynomial_features(X, degree), y)
+    model = accumulator.solve()
+
+    design = polynomial_features(np.vstack([X for X, _ in chunks]), degree)
+    y = np.concatenate([y for _, y in chunks])
+    reference = LinearRegression().fit(design, y)
+    y_pred = reference.predict(design)
+
+    assert model.solver == 'cholesky'
+    np.testing.assert_allclose(model.coef_, reference.coef_, rtol=1e-8, atol=1e-10)
+    assert abs(model.intercept_ - reference.intercept_) < 1e-8
+
+    r2, rmse = accumulator.metrics(model)
+    assert abs(r2 - r2_score(y, y_pred)) < 1e-9
+    assert abs(rmse - np.sqrt(mean_squared_error(y, y_pred))) < 1e-6
+    print(f"✅ 分塊累積與 sklearn 一致: R²={r2:.4f}, RMSE={rmse:.4f}")
+
+
+def test_merge_accumulators():
+    """測試合併兩個累積器等同於一次累積全部資料"""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(-10, 10, (1_000, 3))
+    y = X @ np.array([1.0, -2.0, 0.5]) + 3.0
+
+    whole = GramAccumulator(3).update(X, y)
+    merged = GramAccumulator(3).update(X[:400], y[:400]).merge(GramAccumulator(3).update(X[400:], y[400:]))
+
+    np.testing.assert_allclose(merged.xtx, whole.xtx)
+    np.testing.assert_allclose(merged.solve().coef_, [1.0, -2.0, 0.5], atol=1e-9)
+    print("✅ 累積器合併正確")
+
+
+def test_singular_gram_falls_back_to_lstsq():
+    """測試共線特徵時改用最小平方法"""
+    x = np.arange(10.0)
+    model = GramAccumulator(2).update(np.column_stack([x, 2 * x]), 3 * x + 1).solve()
+    assert model.solver == 'lstsq'
+    np.testing.assert_allclose(model.predict(np.column_stack([x, 2 * x])), 3 * x + 1, atol=1e-8)
+    print("✅ 奇異矩陣改用最小平方法")
+
+
+def test_fit_streaming_recovers_parameters():
+    """測試單次掃描的訓練/測試分割與參數估計"""
+    n_features = 10
+    coefficients = true_coefficients(n_features, 1, 2.0, seed=3)
+    model, train, test = fit_streaming(
+        generate_chunks(50_000, coefficients, 5.0, 1.0, n_features, 1, seed=4),
+        n_features, seed=5,
+    )
+
+    assert train.n + test.n == 50_000
+    assert 0.15 < test.n / 50_000 < 0.25
+    np.testing.assert_allclose(model.coef_, coefficients, atol=0.01)
+    assert abs(model.intercept_ - 5.0) < 0.05
+    print(f"✅ 參數估計成功: train={train.n}, test={test.n}, test R²={test.metrics(model)[0]:.4f}")
+
+
+def test_split_is_independent_of_generated_data():
+    """測試訓練/測試分割不會重用產生 X 的亂數 (兩者的 X 分佈應相同)"""
+    coefficients = true_coefficients(1, 1, 2.0, seed=42)
+    seen = []
+
+    def recording_chunks():
+        for X, y in generate_chunks(20_000, coefficients, 5.0, 2.0, 1, 1, seed=42):
+            seen.append(X[:, 0].copy())
+            yield X, y
+
+    model, train, test = fit_streaming(recording_chunks(), 1, seed=42)
+    x_all = np.concatenate(seen)
+    train_mean = train.x_sum[0] / train.n
+    test_mean = test.x_sum[0] / test.n
+
+    # X ~ U(-10, 10)：平均 0、E[x²] = 100/3；測試集若只含 x < -6 的列，平均會接近 -8
+    assert abs(train_mean) < 0.2 and abs(test_mean) < 0.3
+    assert abs(train.xtx[0, 0] / train.n - 100 / 3) < 1.0
+    assert abs(test.xtx[0, 0] / test.n - 100 / 3) < 1.5
+    assert abs(x_all.mean()) < 0.2
+    assert abs(test.metrics(model)[0] - train.metrics(model)[0]) < 0.02
+    print(f"✅ 分割與資料獨立: train 平均={train_mean:.3f}, test 平均={test_mean:.3f}")
+
+
+def test_chunk_size_follows_column_count():
+    """測試分塊大小由欄位數決定，展開後的設計矩陣不超過記憶體上限"""
+    assert chunk_rows_for(1, budget_bytes=8_000) == 1_000
+    assert chunk_rows_for(1_000, budget_bytes=8_000) == 1
+    assert chunk_rows_for(10_000, budget_bytes=8_000) == 1
+
+    n_features, degree = 50, 4
+    coefficients = true_coefficients(n_features, degree, 2.0, seed=0)
+    limit = chunk_rows_for(n_features * degree)
+    sizes = [len(y) for _, y in generate_chunks(3 * limit, coefficients, 5.0, 1.0, n_features, degree, seed=0)]
+    assert sizes == [limit] * 3
+    assert limit * n_features * degree * 8 <= DEFAULT_CHUNK_BYTES
+    print(f"✅ p={n_features * degree} 時每塊 {limit} 列")
+
+
+def test_fit_streaming_reports_progress_and_can_stop():
+    """測試每個區段回報已處理列數，且 on_progress 丟出例外可中止擬合"""
+    n_features, degree = 20, 2
+    coefficients = true_coefficients(n_features, degree, 2.0, seed=0)
+    limit = chunk_rows_for(n_features * degree)
+    progress = []
+    fit_streaming(generate_chunks(2 * limit + 10, coefficients, 5.0, 1.0, n_features, degree, seed=0),
+                  n_features, degree, on_progress=progress.append)
+    assert progress == [limit, 2 * limit, 2 * limit + 10]
+
+    class Stop(Exception):
+        pass
+
+    def stop_after_first_block(rows):
+        raise Stop(rows)
+
+    try:
+        fit_streaming(generate_chunks(2 * limit, coefficients, 5.0, 1.0, n_features, degree, seed=0),
+                      n_features, degree, on_progress=stop_after_first_block)
+    except Stop as e:
+        assert e.args == (limit,)
+        print(f"✅ 擬合在 {limit} 列後中止")
+    else:
+        raise AssertionError("expected the fit to stop")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+測試跨行程結果快取：讀寫、LRU 淘汰與多行程共用
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from result_store import ResultStore
+
+
+def _write_from_child(directory):
+    ResultStore(directory).put(('dataset', 1), np.arange(5.0))
+
+
+def test_put_and_get():
+    """測試寫入、讀取與 get_or_compute"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = ResultStore(directory)
+        assert store.get(('missing',)) is None
+        store.put(('dataset', (2.0, 5.0)), {'X': [1, 2]})
+        assert store.get(('dataset', (2.0, 5.0))) == {'X': [1, 2]}
+
+        calls = []
+        for _ in range(3):
+            value = store.get_or_compute(('model', 1), lambda: calls.append(1) or 42)
+        assert value == 42
+        assert len(calls) == 1
+        assert store.hits == 3 and store.misses == 2
+        print("✅ 快取讀寫正確")
+
+
+def test_lru_eviction():
+    """測試超過大小上限時淘汰最久未使用的項目"""
+    with tempfile.TemporaryDirectory() as directory:
+        payload = b"x" * 10_000
+        store = ResultStore(directory, max_bytes=25_000)
+        store.put('a', payload)
+        store.put('b', payload)
+        # 讓 'a' 成為最近使用的項目
+        os.utime(store._path('b'), (time.time() - 60, time.time() - 60))
+        assert store.get('a') == payload
+
+        store.put('c', payload)
+        assert store.get('b') is None
+        assert store.get('a') == payload
+        assert store.get('c') == payload
+        assert store.evictions == 1
+        assert store.size_bytes() <= 25_000
+        print("✅ LRU 淘汰正確")
+
+
+def test_shared_across_processes():
+    """測試其他行程寫入的項目可以被讀取"""
+    with tempfile.TemporaryDirectory() as directory:
+        process = multiprocessing.Process(target=_write_from_child, args=(directory,))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+
+        np.testing.assert_array_equal(ResultStore(directory).get(('dataset', 1)), np.arange(5.0))
+        assert not [name for name in os.listdir(directory) if name.endswith('.tmp')]
+        print("✅ 跨行程共用快取")
+
+
+def test_unloadable_entry_is_a_miss():
+    """測試無法載入的項目 (例如舊版程式寫入) 視為未命中並被刪除"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = ResultStore(directory)
+        path = store._path(('model', 1))
+        with open(path, 'wb') as f:
+            # 引用不存在模組中的類別，載入時會丟出 ModuleNotFoundError
+            f.write(b"cmissing_module\nLinearModel\n.")
+        assert store.get(('model', 1)) is None
+        assert not os.path.exists(path)
+        assert store.get_or_compute(('model', 1), lambda: 'refit') == 'refit'
+        assert store.misses == 2
+        print("✅ 無法載入的項目視為未命中")
+
+
+def test_stale_tmp_files_are_removed():
+    """測試寫入中途崩潰留下的暫存檔會在淘汰時清除，但不影響正在寫入的檔案"""
+    with tempfile.TemporaryDirectory() as directory:
+        stale = os.path.join(directory, 'crashed.tmp')
+        fresh = os.path.join(directory, 'writing.tmp')
+        for path in (stale, fresh):
+            with open(path, 'wb') as f:
+                f.write(b"partial")
+        os.utime(stale, (time.time() - 7200, time.time() - 7200))
+
+        ResultStore(directory).put('a', 1)
+        assert not os.path.exists(stale)
+        assert os.path.exists(fresh)
+        print("✅ 過期暫存檔已清除")